@@ -26,6 +26,7 @@ class AppSettings:
     enable_background_blur: bool = False
     enable_background_replace: bool = False
     background_blur_strength: int = 25
+    enable_person_crop: bool = True
     output_width: int = 1280
     output_height: int = 720
     output_fps: int = 30
@@ -5,10 +5,29 @@ import numpy as np
 import mediapipe as mp
 
 
+Roi = tuple[int, int, int, int]
+
+# Input sizes of the Selfie Segmentation models: landscape (model_selection=1)
+# for full frames, general (model_selection=0) for person crops.
+MODEL_INPUT_SIZE = (256, 144)
+CROP_MODEL_INPUT_SIZE = (256, 256)
+
+# Person crop: minimum frame width, margin around the previous mask,
+# full-frame refresh period and the ROI share of the frame above which
+# cropping is not worth it.
+CROP_MIN_WIDTH = MODEL_INPUT_SIZE[0] * 6
+CROP_MARGIN = 0.15
+CROP_REFRESH_FRAMES = 30
+CROP_MAX_AREA = 0.7
+
+
 class BackgroundProcessor:
     def __init__(self) -> None:
         selfie_segmentation_api = self._get_selfie_segmentation_api()
         self._segmenter = selfie_segmentation_api.SelfieSegmentation(model_selection=1)
+        self._crop_segmenter = selfie_segmentation_api.SelfieSegmentation(model_selection=0)
+        self._roi: Roi | None = None
+        self._frames_since_full = 0
 
     @staticmethod
     def _get_selfie_segmentation_api():
@@ -25,22 +44,106 @@ class BackgroundProcessor:
                 "Используйте Python 3.10-3.12 и установленный пакет mediapipe."
             ) from exc
 
-    def apply(
-        self,
+    def segment(self, frame_bgr: np.ndarray, crop: bool = False) -> np.ndarray | None:
+        """Person mask for the frame.
+
+        With ``crop`` on frames at least ``CROP_MIN_WIDTH`` wide, only the
+        region around the previous mask is segmented and everything outside
+        it is treated as background. The whole frame is segmented again
+        periodically, and whenever the person reaches the crop border, so
+        people entering the frame are picked up.
+        """
+        h, w = frame_bgr.shape[:2]
+        if not crop or w < CROP_MIN_WIDTH:
+            self.reset()
+            return self._segment_region(frame_bgr, self._segmenter)
+
+        stale = self._roi is None or self._roi[2] > w or self._roi[3] > h
+        if stale or self._frames_since_full >= CROP_REFRESH_FRAMES:
+            self._frames_since_full = 0
+            mask = self._segment_region(frame_bgr, self._segmenter)
+            self._roi = self._person_roi(mask, (0, 0), (h, w)) if mask is not None else None
+            return mask
+
+        self._frames_since_full += 1
+        roi = self._roi
+        assert roi is not None
+        x1, y1, x2, y2 = roi
+        crop_mask = self._segment_crop(frame_bgr[y1:y2, x1:x2])
+        if crop_mask is None:
+            self.reset()
+            return None
+
+        mask = np.zeros((h, w), dtype=bool)
+        mask[y1:y2, x1:x2] = crop_mask
+
+        # A person cut off by a crop side that is not the frame edge may extend
+        # past the crop, so the next frame is segmented in full.
+        cut_off = (
+            (y1 > 0 and crop_mask[0].any())
+            or (y2 < h and crop_mask[-1].any())
+            or (x1 > 0 and crop_mask[:, 0].any())
+            or (x2 < w and crop_mask[:, -1].any())
+        )
+        self._roi = None if cut_off else self._person_roi(crop_mask, (x1, y1), (h, w))
+        return mask
+
+    def reset(self) -> None:
+        """Forget the person crop; the next cropped frame is segmented in full."""
+        self._roi = None
+        self._frames_since_full = 0
+
+    @staticmethod
+    def _segment_region(region_bgr: np.ndarray, segmenter) -> np.ndarray | None:
+        rgb = cv2.cvtColor(region_bgr, cv2.COLOR_BGR2RGB)
+        result = segmenter.process(rgb)
+        if result.segmentation_mask is None:
+            return None
+        return result.segmentation_mask > 0.5
+
+    def _segment_crop(self, region_bgr: np.ndarray) -> np.ndarray | None:
+        # Letterbox the crop to the model aspect so it is scaled, not squashed.
+        h, w = region_bgr.shape[:2]
+        aspect = CROP_MODEL_INPUT_SIZE[0] / CROP_MODEL_INPUT_SIZE[1]
+        pad_w = max(int(round(h * aspect)) - w, 0)
+        pad_h = max(int(round(w / aspect)) - h, 0)
+        padded = cv2.copyMakeBorder(region_bgr, 0, pad_h, 0, pad_w, cv2.BORDER_CONSTANT, value=(0, 0, 0))
+        mask = self._segment_region(padded, self._crop_segmenter)
+        return mask[:h, :w] if mask is not None else None
+
+    @staticmethod
+    def _person_roi(mask: np.ndarray, offset: tuple[int, int], shape: tuple[int, int]) -> Roi | None:
+        """Margin-padded bounding box of ``mask`` placed at ``offset`` (x, y)
+        in a frame of ``shape``, or ``None`` when it is empty or too large."""
+        rows = np.flatnonzero(mask.any(axis=1))
+        cols = np.flatnonzero(mask.any(axis=0))
+        if len(rows) == 0:
+            return None
+
+        h, w = shape
+        ox, oy = offset
+        y1, y2 = oy + int(rows[0]), oy + int(rows[-1]) + 1
+        x1, x2 = ox + int(cols[0]), ox + int(cols[-1]) + 1
+        pad_y = int((y2 - y1) * CROP_MARGIN)
+        pad_x = int((x2 - x1) * CROP_MARGIN)
+
+        x1, x2 = max(x1 - pad_x, 0), min(x2 + pad_x, w)
+        y1, y2 = max(y1 - pad_y, 0), min(y2 + pad_y, h)
+        if (x2 - x1) * (y2 - y1) > CROP_MAX_AREA * w * h:
+            return None
+        return x1, y1, x2, y2
+
+    @staticmethod
+    def composite(
         frame_bgr: np.ndarray,
+        mask: np.ndarray | None,
         enable_blur: bool,
         enable_replace: bool,
         blur_strength: int,
     ) -> np.ndarray:
-        if not enable_blur and not enable_replace:
-            return frame_bgr
-
-        rgb = cv2.cvtColor(frame_bgr, cv2.COLOR_BGR2RGB)
-        result = self._segmenter.process(rgb)
-        if result.segmentation_mask is None:
+        if mask is None or (not enable_blur and not enable_replace):
             return frame_bgr
 
-        mask = result.segmentation_mask > 0.5
         output = frame_bgr.copy()
 
         if enable_blur:
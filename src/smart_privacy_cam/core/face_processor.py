@@ -1,14 +1,27 @@
 from __future__ import annotations
 
+from dataclasses import dataclass
+
 import cv2
 import numpy as np
 import mediapipe as mp
 
 from smart_privacy_cam.config import AppSettings, PrivacyMode, ThirdPartyMode
+from smart_privacy_cam.core.face_identity import OwnerProfile, OwnerTracker
+
+
+@dataclass
+class FaceBox:
+    x1: int
+    y1: int
+    x2: int
+    y2: int
+    depth: float
+    is_owner: bool = False
 
 
 class FaceProcessor:
-    def __init__(self) -> None:
+    def __init__(self, owner: OwnerProfile | None = None) -> None:
         face_mesh_api = self._get_face_mesh_api()
         self._mesh = face_mesh_api.FaceMesh(
             static_image_mode=False,
@@ -17,6 +30,7 @@ class FaceProcessor:
             min_detection_confidence=0.5,
             min_tracking_confidence=0.5,
         )
+        self._owner = OwnerTracker(owner or OwnerProfile())
 
     @staticmethod
     def _get_face_mesh_api():
@@ -33,52 +47,78 @@ class FaceProcessor:
                 "Используйте Python 3.10-3.12 и установленный пакет mediapipe."
             ) from exc
 
-    def apply(self, frame_bgr: np.ndarray, settings: AppSettings) -> np.ndarray:
+    def detect(self, frame_bgr: np.ndarray, settings: AppSettings) -> list[FaceBox]:
         rgb = cv2.cvtColor(frame_bgr, cv2.COLOR_BGR2RGB)
         results = self._mesh.process(rgb)
-        if not results.multi_face_landmarks:
-            return frame_bgr
+        faces = results.multi_face_landmarks
+        if not faces:
+            self._owner.identify(np.empty((0, 4)), np.empty((0, 0, 3)))
+            return []
 
-        output = frame_bgr.copy()
-        face_boxes: list[tuple[int, int, int, int, float]] = []
         h, w = frame_bgr.shape[:2]
+        landmarks = np.array(
+            [[(p.x * w, p.y * h, p.z * w) for p in face.landmark] for face in faces],
+            dtype=np.float32,
+        )
 
-        for face_landmarks in results.multi_face_landmarks:
-            xs = [p.x for p in face_landmarks.landmark]
-            ys = [p.y for p in face_landmarks.landmark]
-            zs = [p.z for p in face_landmarks.landmark]
-
-            x1 = max(int(min(xs) * w), 0)
-            y1 = max(int(min(ys) * h), 0)
-            x2 = min(int(max(xs) * w), w - 1)
-            y2 = min(int(max(ys) * h), h - 1)
-
-            avg_depth = float(np.mean(zs))
-            face_boxes.append((x1, y1, x2, y2, avg_depth))
+        boxes = np.empty((len(faces), 4), dtype=np.float32)
+        boxes[:, :2] = landmarks[:, :, :2].min(axis=1)
+        boxes[:, 2:] = landmarks[:, :, :2].max(axis=1)
+
+        owner_flags = self._owner.identify(boxes, landmarks)
+        if owner_flags is None:
+            owner_flags = np.zeros(len(faces), dtype=bool)
+            owner_flags[min(settings.owner_face_index, len(faces) - 1)] = True
+
+        face_boxes: list[FaceBox] = []
+        for (x1, y1, x2, y2), face_landmarks, is_owner in zip(boxes, landmarks, owner_flags):
+            face_boxes.append(
+                FaceBox(
+                    x1=max(int(x1), 0),
+                    y1=max(int(y1), 0),
+                    x2=min(int(x2), w - 1),
+                    y2=min(int(y2), h - 1),
+                    depth=float(np.mean(face_landmarks[:, 2])) / w,
+                    is_owner=bool(is_owner),
+                )
+            )
+
+        return face_boxes
+
+    @classmethod
+    def render(cls, frame_bgr: np.ndarray, face_boxes: list[FaceBox], settings: AppSettings) -> np.ndarray:
+        if not face_boxes:
+            return frame_bgr
 
-        owner_idx = min(settings.owner_face_index, len(face_boxes) - 1)
+        output = frame_bgr.copy()
+        # Without enrollment one face is always the owner. An enrolled owner
+        # that was not matched may still be in view, so fail closed.
+        owner_found = any(face.is_owner for face in face_boxes)
 
-        for idx, (x1, y1, x2, y2, depth) in enumerate(face_boxes):
-            should_hide = self._should_hide(idx, owner_idx, settings.third_party_mode)
+        for face in face_boxes:
+            should_hide = cls._should_hide(face.is_owner, owner_found, settings.third_party_mode)
             if not should_hide:
                 continue
 
-            z_scale = np.clip(1.0 + abs(depth) * 4.0, 1.0, 1.8)
-            output = self._apply_privacy_mask(output, x1, y1, x2, y2, z_scale, settings.privacy_mode)
+            z_scale = np.clip(1.0 + abs(face.depth) * 4.0, 1.0, 1.8)
+            output = cls._apply_privacy_mask(
+                output, face.x1, face.y1, face.x2, face.y2, z_scale, settings.privacy_mode
+            )
 
         return output
 
-    def _should_hide(self, idx: int, owner_idx: int, mode: ThirdPartyMode) -> bool:
+    @staticmethod
+    def _should_hide(is_owner: bool, owner_found: bool, mode: ThirdPartyMode) -> bool:
         if mode == ThirdPartyMode.HIDE_ALL:
             return True
         if mode == ThirdPartyMode.HIDE_OWNER:
-            return idx == owner_idx
+            return is_owner or not owner_found
         if mode == ThirdPartyMode.HIDE_OTHERS:
-            return idx != owner_idx
+            return not is_owner
         return False
 
+    @staticmethod
     def _apply_privacy_mask(
-        self,
         image: np.ndarray,
         x1: int,
         y1: int,
@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 from dataclasses import replace
-import queue
+from functools import partial
 import threading
 from typing import Callable
 
@@ -11,7 +11,9 @@ import numpy as np
 from smart_privacy_cam.config import AppSettings
 from smart_privacy_cam.core.background_processor import BackgroundProcessor
 from smart_privacy_cam.core.camera_manager import open_camera
-from smart_privacy_cam.core.face_processor import FaceProcessor
+from smart_privacy_cam.core.face_identity import OwnerProfile
+from smart_privacy_cam.core.face_processor import FaceBox, FaceProcessor
+from smart_privacy_cam.core.stage_graph import Stage, StageFn, StageGraph, StageStats
 from smart_privacy_cam.core.virtual_output import VirtualOutput
 
 
@@ -19,30 +21,86 @@ PreviewCallback = Callable[[np.ndarray], None]
 ErrorCallback = Callable[[str], None]
 
 
+def detect_stage(owner: OwnerProfile | None = None) -> StageFn:
+    face = FaceProcessor(owner)
+
+    def run(settings: AppSettings, frame: np.ndarray) -> list[FaceBox]:
+        return face.detect(frame, settings)
+
+    return run
+
+
+def segment_stage() -> StageFn:
+    background = BackgroundProcessor()
+
+    def run(settings: AppSettings, frame: np.ndarray) -> np.ndarray | None:
+        if not settings.enable_background_blur and not settings.enable_background_replace:
+            background.reset()
+            return None
+        return background.segment(frame, crop=settings.enable_person_crop)
+
+    return run
+
+
+def composite_stage() -> StageFn:
+    def run(settings: AppSettings, frame: np.ndarray, mask: np.ndarray | None) -> np.ndarray:
+        return BackgroundProcessor.composite(
+            frame,
+            mask,
+            enable_blur=settings.enable_background_blur,
+            enable_replace=settings.enable_background_replace,
+            blur_strength=settings.background_blur_strength,
+        )
+
+    return run
+
+
+def overlay_stage() -> StageFn:
+    def run(settings: AppSettings, frame: np.ndarray, faces: list[FaceBox]) -> np.ndarray:
+        return FaceProcessor.render(frame, faces, settings)
+
+    return run
+
+
+def processing_stages(owner: OwnerProfile | None = None) -> list[Stage]:
+    """Default processing graph: detect and segment run side by side on the
+    captured frame, then composite and overlay assemble the output frame.
+
+    Factories are module-level, so any of these stages can be moved to its own
+    process with ``dataclasses.replace(stage, placement="process")``.
+    ``owner`` is the profile the detect stage enrolls into and matches against.
+    """
+    return [
+        Stage("detect", partial(detect_stage, owner), inputs=("frame",), outputs=("faces",)),
+        Stage("segment", segment_stage, inputs=("frame",), outputs=("mask",)),
+        Stage("composite", composite_stage, inputs=("frame", "mask"), outputs=("composited",)),
+        Stage("overlay", overlay_stage, inputs=("composited", "faces"), outputs=("output",)),
+    ]
+
+
 class VideoPipeline:
     def __init__(
         self,
         settings: AppSettings,
         on_preview: PreviewCallback | None = None,
         on_error: ErrorCallback | None = None,
+        stages: list[Stage] | None = None,
+        owner: OwnerProfile | None = None,
     ) -> None:
         self._settings = settings
         self._on_preview = on_preview
         self._on_error = on_error
 
-        self._frame_queue: queue.Queue[np.ndarray] = queue.Queue(maxsize=2)
-        self._processed_queue: queue.Queue[np.ndarray] = queue.Queue(maxsize=2)
-
         self._stop_event = threading.Event()
         self._capture_thread: threading.Thread | None = None
-        self._process_thread: threading.Thread | None = None
-        self._output_thread: threading.Thread | None = None
 
         self._settings_lock = threading.Lock()
 
-        self._face = FaceProcessor()
-        self._background = BackgroundProcessor()
         self._output = VirtualOutput(settings.output_width, settings.output_height, settings.output_fps)
+        self._owner = owner or OwnerProfile()
+        if stages is None:
+            stages = processing_stages(self._owner) + [Stage("sink", self._sink_stage, inputs=("output",))]
+        self._graph = StageGraph(stages, sources=("frame",), on_error=self._on_stage_error)
 
     def start(self) -> None:
         if self._capture_thread and self._capture_thread.is_alive():
@@ -50,26 +108,31 @@ class VideoPipeline:
 
         self._stop_event.clear()
         self._output.start()
+        try:
+            self._graph.start()
+        except Exception:
+            self._output.stop()
+            raise
 
         self._capture_thread = threading.Thread(target=self._capture_loop, daemon=True)
-        self._process_thread = threading.Thread(target=self._process_loop, daemon=True)
-        self._output_thread = threading.Thread(target=self._output_loop, daemon=True)
-
         self._capture_thread.start()
-        self._process_thread.start()
-        self._output_thread.start()
 
     def stop(self) -> None:
         self._stop_event.set()
-        for t in (self._capture_thread, self._process_thread, self._output_thread):
-            if t and t.is_alive():
-                t.join(timeout=1.0)
+        if self._capture_thread and self._capture_thread.is_alive():
+            self._capture_thread.join(timeout=1.0)
+        self._graph.stop()
         self._output.stop()
+        # An unfinished enrollment is dropped; a stored owner is kept.
+        self._owner.cancel_enrollment()
 
     def update_settings(self, settings: AppSettings) -> None:
         with self._settings_lock:
             self._settings = replace(settings)
 
+    def stage_stats(self) -> list[StageStats]:
+        return self._graph.stats()
+
     def _snapshot_settings(self) -> AppSettings:
         with self._settings_lock:
             return replace(self._settings)
@@ -99,56 +162,24 @@ class VideoPipeline:
                 if not ok:
                     continue
 
-                self._put_latest(self._frame_queue, frame)
+                self._graph.submit("frame", frame, settings)
         finally:
             if cap is not None:
                 cap.release()
 
-    def _process_loop(self) -> None:
-        while not self._stop_event.is_set():
-            frame = self._get_with_timeout(self._frame_queue)
-            if frame is None:
-                continue
-
-            settings = self._snapshot_settings()
-            processed = self._face.apply(frame, settings)
-            processed = self._background.apply(
-                processed,
-                enable_blur=settings.enable_background_blur,
-                enable_replace=settings.enable_background_replace,
-                blur_strength=settings.background_blur_strength,
-            )
-            self._put_latest(self._processed_queue, processed)
-
-    def _output_loop(self) -> None:
-        while not self._stop_event.is_set():
-            frame = self._get_with_timeout(self._processed_queue)
-            if frame is None:
-                continue
-
-            try:
-                self._output.send(frame)
-            except Exception as exc:
-                self._stop_event.set()
-                if self._on_error is not None:
-                    self._on_error(f"Ошибка виртуальной камеры: {exc}")
-                return
-
+    def _sink_stage(self) -> StageFn:
+        def run(settings: AppSettings, frame: np.ndarray) -> None:
+            self._output.send(frame)
             if self._on_preview is not None:
                 self._on_preview(frame)
 
-    @staticmethod
-    def _put_latest(q: queue.Queue[np.ndarray], frame: np.ndarray) -> None:
-        if q.full():
-            try:
-                q.get_nowait()
-            except queue.Empty:
-                pass
-        q.put_nowait(frame)
-
-    @staticmethod
-    def _get_with_timeout(q: queue.Queue[np.ndarray], timeout: float = 0.1) -> np.ndarray | None:
-        try:
-            return q.get(timeout=timeout)
-        except queue.Empty:
-            return None
+        return run
+
+    def _on_stage_error(self, stage_name: str, message: str) -> None:
+        self._stop_event.set()
+        if self._on_error is None:
+            return
+        if stage_name == "sink":
+            self._on_error(f"Ошибка виртуальной камеры: {message}")
+        else:
+            self._on_error(f"Ошибка стадии «{stage_name}»: {message}")
@@ -0,0 +1,405 @@
+"""Configurable stage graph for the video pipeline.
+
+Each stage declares the channels it reads and writes, owns a bounded input
+queue per channel and runs on its own thread or process. Stages without a
+data dependency between them run concurrently; stages with several inputs
+wait until all of them carry the same frame.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+import multiprocessing as mp
+import queue
+import threading
+import time
+from typing import Any, Callable, Literal
+
+
+StageFn = Callable[..., Any]
+StageFactory = Callable[[], StageFn]
+Placement = Literal["thread", "process"]
+StageErrorCallback = Callable[[str, str], None]
+
+PLACEMENTS: tuple[str, ...] = ("thread", "process")
+
+
+@dataclass(frozen=True)
+class Stage:
+    """Processing stage description.
+
+    ``factory`` is called once inside the worker and returns the function
+    that handles frames: ``fn(settings, *inputs)``. It returns a single value
+    for a stage with one output and a tuple for several outputs. Stages placed
+    in a process must have a picklable (module-level) factory.
+    """
+
+    name: str
+    factory: StageFactory
+    inputs: tuple[str, ...]
+    outputs: tuple[str, ...] = ()
+    queue_size: int = 2
+    placement: Placement = "thread"
+
+
+@dataclass
+class StageStats:
+    name: str
+    placement: str
+    frames: int
+    fps: float
+    avg_ms: float
+    dropped: int
+
+
+@dataclass
+class _Packet:
+    seq: int
+    settings: Any
+    value: Any
+
+
+class _Counters:
+    def __init__(self, ctx: Any) -> None:
+        self.frames = ctx.Value("Q", 0)
+        self.busy = ctx.Value("d", 0.0)
+        self.dropped = ctx.Value("Q", 0)
+
+
+_Edge = tuple[Any, _Counters]
+
+
+class _InputJoin:
+    """Pairs packets of the same frame across several inputs.
+
+    Frames are released oldest first. Unmatched packets are kept (up to
+    ``depth`` per input) until a newer frame is matched; packets that can no
+    longer be matched are counted as dropped.
+    """
+
+    def __init__(self, queues: list[Any], counters: _Counters, depth: int = 8) -> None:
+        self._queues = queues
+        self._counters = counters
+        self._depth = depth
+        self._pending: list[dict[int, _Packet]] = [{} for _ in queues]
+        self._last_seq = 0
+
+    def next(self, timeout: float = 0.1) -> list[_Packet] | None:
+        while True:
+            # Move whatever is queued into the buffers first, so a fast input
+            # does not overflow its queue while we wait for a slow one. A
+            # single input is read as is, leaving its queue bounded.
+            if len(self._queues) > 1:
+                for i, q in enumerate(self._queues):
+                    while (packet := _get_nowait(q)) is not None:
+                        self._add(i, packet)
+
+            common = set(self._pending[0]).intersection(*self._pending[1:])
+            if common:
+                # Queues are ordered by seq, so older unmatched packets will
+                # never get a partner.
+                seq = min(common)
+                packets = [pending.pop(seq) for pending in self._pending]
+                self._last_seq = seq
+                for pending in self._pending:
+                    for stale in [k for k in pending if k < seq]:
+                        del pending[stale]
+                        _count_drop(self._counters)
+                return packets
+
+            # Read from the input that lags behind the others.
+            lagging = min(range(len(self._queues)), key=lambda i: max(self._pending[i], default=0))
+            packet = _get_with_timeout(self._queues[lagging], timeout)
+            if packet is None:
+                return None
+            self._add(lagging, packet)
+
+    def _add(self, index: int, packet: _Packet) -> None:
+        if packet.seq <= self._last_seq:
+            _count_drop(self._counters)
+            return
+        pending = self._pending[index]
+        pending[packet.seq] = packet
+        if len(pending) > self._depth:
+            del pending[min(pending)]
+            _count_drop(self._counters)
+
+
+def _publish(edges: list[_Edge], packet: _Packet) -> None:
+    if len(edges) == 1:
+        q, consumer = edges[0]
+        _put_latest(q, packet, consumer)
+        return
+
+    # Fan-out delivers a frame to every consumer or to none of them, so
+    # parallel branches see the same frames and their outputs can be joined.
+    if any(q.full() for q, _ in edges):
+        for _, consumer in edges:
+            _count_drop(consumer)
+        return
+    for q, consumer in edges:
+        try:
+            q.put_nowait(packet)
+        except queue.Full:
+            _count_drop(consumer)
+
+
+def _put_latest(q: Any, packet: _Packet, consumer: _Counters) -> None:
+    while True:
+        try:
+            q.put_nowait(packet)
+            return
+        except queue.Full:
+            pass
+        try:
+            q.get_nowait()
+        except queue.Empty:
+            continue
+        _count_drop(consumer)
+
+
+def _count_drop(consumer: _Counters) -> None:
+    with consumer.dropped.get_lock():
+        consumer.dropped.value += 1
+
+
+def _get_nowait(q: Any) -> Any | None:
+    try:
+        return q.get_nowait()
+    except queue.Empty:
+        return None
+
+
+def _get_with_timeout(q: Any, timeout: float) -> Any | None:
+    try:
+        return q.get(timeout=timeout)
+    except queue.Empty:
+        return None
+
+
+def _run_stage(
+    stage: Stage,
+    fn: StageFn | None,
+    inputs: list[Any],
+    outputs: dict[str, list[_Edge]],
+    counters: _Counters,
+    stop_event: Any,
+    errors: Any,
+) -> None:
+    try:
+        if fn is None:
+            fn = stage.factory()
+        join = _InputJoin(inputs, counters)
+
+        while not stop_event.is_set():
+            packets = join.next()
+            if packets is None:
+                continue
+
+            started = time.perf_counter()
+            result = fn(packets[0].settings, *(p.value for p in packets))
+            elapsed = time.perf_counter() - started
+
+            with counters.frames.get_lock():
+                counters.frames.value += 1
+            with counters.busy.get_lock():
+                counters.busy.value += elapsed
+
+            if not stage.outputs:
+                continue
+
+            values = (result,) if len(stage.outputs) == 1 else tuple(result)
+            seq, settings = packets[0].seq, packets[0].settings
+            for channel, value in zip(stage.outputs, values):
+                edges = outputs.get(channel)
+                if edges:
+                    _publish(edges, _Packet(seq, settings, value))
+    except Exception as exc:
+        # Report before stopping, so the supervisor never sees the stop flag
+        # without the error that caused it.
+        errors.put((stage.name, str(exc)))
+        stop_event.set()
+
+
+class StageGraph:
+    def __init__(
+        self,
+        stages: list[Stage],
+        sources: tuple[str, ...] = ("frame",),
+        on_error: StageErrorCallback | None = None,
+    ) -> None:
+        self._stages = self._validate(stages, sources)
+        self._sources = sources
+        self._on_error = on_error
+
+        self._ctx = mp.get_context("spawn")
+        self._stop_event = self._ctx.Event()
+        self._counters = {stage.name: _Counters(self._ctx) for stage in self._stages}
+        self._source_edges: dict[str, list[_Edge]] = {}
+        self._queues: list[Any] = []
+        self._workers: list[threading.Thread | Any] = []
+        self._supervisor: threading.Thread | None = None
+        self._seq = 0
+        self._seq_lock = threading.Lock()
+
+        self._started_at = 0.0
+        self._last_stats: dict[str, tuple[float, int, float]] = {}
+
+    def is_running(self) -> bool:
+        return bool(self._workers) and not self._stop_event.is_set()
+
+    def start(self) -> None:
+        if self.is_running():
+            return
+
+        self._stop_event.clear()
+        self._counters = {stage.name: _Counters(self._ctx) for stage in self._stages}
+        uses_processes = any(stage.placement == "process" for stage in self._stages)
+        errors: Any = self._ctx.Queue() if uses_processes else queue.Queue()
+        # Process queues must stay referenced for the whole run: Process.start()
+        # drops its args, and a collected queue unlinks its semaphores before
+        # the spawned child has unpickled them.
+        self._queues = [errors]
+
+        inputs: dict[str, list[Any]] = {stage.name: [] for stage in self._stages}
+        edges: dict[str, list[_Edge]] = {}
+        producer_placement = {ch: s.placement for s in self._stages for ch in s.outputs}
+        for stage in self._stages:
+            for channel in stage.inputs:
+                crosses_process = "process" in (stage.placement, producer_placement.get(channel, "thread"))
+                q = self._ctx.Queue(stage.queue_size) if crosses_process else queue.Queue(stage.queue_size)
+                inputs[stage.name].append(q)
+                self._queues.append(q)
+                edges.setdefault(channel, []).append((q, self._counters[stage.name]))
+
+        self._source_edges = {ch: edges.get(ch, []) for ch in self._sources}
+
+        # Thread stages are built here so construction errors reach the caller.
+        built = {s.name: s.factory() for s in self._stages if s.placement == "thread"}
+
+        self._workers = []
+        for stage in self._stages:
+            outputs = {ch: edges.get(ch, []) for ch in stage.outputs}
+            args = (
+                stage,
+                built.get(stage.name),
+                inputs[stage.name],
+                outputs,
+                self._counters[stage.name],
+                self._stop_event,
+                errors,
+            )
+            if stage.placement == "process":
+                worker: Any = self._ctx.Process(target=_run_stage, args=args, name=stage.name, daemon=True)
+            else:
+                worker = threading.Thread(target=_run_stage, args=args, name=stage.name, daemon=True)
+            self._workers.append(worker)
+
+        self._supervisor = threading.Thread(target=self._supervise, args=(errors,), daemon=True)
+        self._started_at = time.perf_counter()
+        self._last_stats = {}
+
+        for worker in self._workers:
+            worker.start()
+        self._supervisor.start()
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        for worker in self._workers:
+            worker.join(timeout=1.0)
+            if isinstance(worker, mp.process.BaseProcess) and worker.is_alive():
+                worker.terminate()
+        if self._supervisor is not None and self._supervisor is not threading.current_thread():
+            self._supervisor.join(timeout=1.0)
+
+    def submit(self, channel: str, value: Any, settings: Any) -> None:
+        with self._seq_lock:
+            self._seq += 1
+            seq = self._seq
+        edges = self._source_edges.get(channel)
+        if edges:
+            _publish(edges, _Packet(seq, settings, value))
+
+    def stats(self) -> list[StageStats]:
+        now = time.perf_counter()
+        result: list[StageStats] = []
+        for stage in self._stages:
+            counters = self._counters[stage.name]
+            frames = int(counters.frames.value)
+            busy = float(counters.busy.value)
+            prev_time, prev_frames, prev_busy = self._last_stats.get(stage.name, (self._started_at, 0, 0.0))
+            self._last_stats[stage.name] = (now, frames, busy)
+
+            window = now - prev_time
+            window_frames = frames - prev_frames
+            result.append(
+                StageStats(
+                    name=stage.name,
+                    placement=stage.placement,
+                    frames=frames,
+                    fps=window_frames / window if window > 0 else 0.0,
+                    avg_ms=(busy - prev_busy) / window_frames * 1000.0 if window_frames else 0.0,
+                    dropped=int(counters.dropped.value),
+                )
+            )
+        return result
+
+    def _supervise(self, errors: Any) -> None:
+        while True:
+            item = _get_with_timeout(errors, 0.1)
+            if item is not None:
+                self._report(*item)
+                continue
+
+            if self._stop_event.is_set():
+                # A process worker's error may still be in flight.
+                while (item := _get_with_timeout(errors, 0.2)) is not None:
+                    self._report(*item)
+                return
+
+            dead = next((w for w in self._workers if not w.is_alive()), None)
+            if dead is not None:
+                self._stop_event.set()
+                exitcode = getattr(dead, "exitcode", None)
+                suffix = f" (код {exitcode})" if exitcode is not None else ""
+                self._report(dead.name, f"обработчик неожиданно завершился{suffix}")
+
+    def _report(self, stage_name: str, message: str) -> None:
+        if self._on_error is not None:
+            self._on_error(stage_name, message)
+
+    @staticmethod
+    def _validate(stages: list[Stage], sources: tuple[str, ...]) -> list[Stage]:
+        producers: dict[str, str] = {}
+        names: set[str] = set()
+        for stage in stages:
+            if stage.name in names:
+                raise ValueError(f"Стадия «{stage.name}» объявлена дважды.")
+            names.add(stage.name)
+            if stage.placement not in PLACEMENTS:
+                raise ValueError(f"Стадия «{stage.name}»: неизвестное размещение «{stage.placement}».")
+            if not stage.inputs:
+                raise ValueError(f"Стадия «{stage.name}» не объявляет входов.")
+            if stage.queue_size < 1:
+                raise ValueError(f"Стадия «{stage.name}»: размер очереди должен быть не меньше 1.")
+            for channel in stage.outputs:
+                if channel in sources or channel in producers:
+                    raise ValueError(f"Канал «{channel}» уже имеет источник.")
+                producers[channel] = stage.name
+
+        for stage in stages:
+            for channel in stage.inputs:
+                if channel not in sources and channel not in producers:
+                    raise ValueError(f"Стадия «{stage.name}»: у канала «{channel}» нет источника.")
+
+        # Kahn's algorithm: the graph must be acyclic so every frame drains.
+        ready = set(sources)
+        pending = list(stages)
+        while pending:
+            runnable = [s for s in pending if all(ch in ready for ch in s.inputs)]
+            if not runnable:
+                cycle = ", ".join(s.name for s in pending)
+                raise ValueError(f"Граф стадий содержит цикл: {cycle}.")
+            for stage in runnable:
+                ready.update(stage.outputs)
+                pending.remove(stage)
+        return list(stages)
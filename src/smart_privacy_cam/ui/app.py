@@ -17,6 +17,7 @@ from smart_privacy_cam.config import (
     load_presets,
 )
 from smart_privacy_cam.core.camera_manager import detect_cameras
+from smart_privacy_cam.core.face_identity import OwnerProfile
 from smart_privacy_cam.core.pipeline import VideoPipeline
 
 
@@ -32,8 +33,11 @@ class SmartPrivacyApp(ctk.CTk):
         self._presets: list[Preset] = load_presets(self._presets_path)
         self._settings = replace(self._presets[0].settings) if self._presets else AppSettings()
         self._pipeline: VideoPipeline | None = None
+        # Outlives pipelines, so the enrolled owner survives Stop/Start.
+        self._owner = OwnerProfile()
         self._preview_lock = threading.Lock()
         self._last_preview_image: ctk.CTkImage | None = None
+        self._stats_job: str | None = None
 
         self._cameras = detect_cameras()
 
@@ -100,6 +104,14 @@ class SmartPrivacyApp(ctk.CTk):
         )
         self.bg_replace_switch.grid(row=row, column=0, padx=10, pady=6, sticky="w")
 
+        row += 1
+        self.person_crop_switch = ctk.CTkSwitch(
+            self.sidebar,
+            text="Person Crop",
+            command=self._on_person_crop_toggle,
+        )
+        self.person_crop_switch.grid(row=row, column=0, padx=10, pady=6, sticky="w")
+
         row += 1
         self.owner_face_slider = ctk.CTkSlider(
             self.sidebar,
@@ -110,6 +122,16 @@ class SmartPrivacyApp(ctk.CTk):
         )
         self.owner_face_slider.grid(row=row, column=0, padx=10, pady=6, sticky="ew")
 
+        row += 1
+        self.enroll_owner_btn = ctk.CTkButton(
+            self.sidebar, text="Enroll Owner", command=self._on_enroll_owner, state="disabled"
+        )
+        self.enroll_owner_btn.grid(row=row, column=0, padx=10, pady=6, sticky="ew")
+
+        row += 1
+        self.owner_label = ctk.CTkLabel(self.sidebar, text="", anchor="w")
+        self.owner_label.grid(row=row, column=0, padx=10, pady=(0, 6), sticky="ew")
+
         row += 1
         self.start_btn = ctk.CTkButton(self.sidebar, text="Start", command=self.start_pipeline)
         self.start_btn.grid(row=row, column=0, padx=10, pady=(12, 6), sticky="ew")
@@ -118,6 +140,10 @@ class SmartPrivacyApp(ctk.CTk):
         self.stop_btn = ctk.CTkButton(self.sidebar, text="Stop", command=self.stop_pipeline)
         self.stop_btn.grid(row=row, column=0, padx=10, pady=(0, 12), sticky="ew")
 
+        row += 1
+        self.stats_label = ctk.CTkLabel(self.sidebar, text="", justify="left", anchor="w")
+        self.stats_label.grid(row=row, column=0, padx=10, pady=(0, 12), sticky="ew")
+
         self.protocol("WM_DELETE_WINDOW", self._on_close)
 
     def _populate_controls(self) -> None:
@@ -142,7 +168,13 @@ class SmartPrivacyApp(ctk.CTk):
         else:
             self.bg_replace_switch.deselect()
 
+        if self._settings.enable_person_crop:
+            self.person_crop_switch.select()
+        else:
+            self.person_crop_switch.deselect()
+
         self.owner_face_slider.set(self._settings.owner_face_index)
+        self._refresh_owner_state()
 
     def start_pipeline(self) -> None:
         try:
@@ -151,8 +183,11 @@ class SmartPrivacyApp(ctk.CTk):
                     settings=replace(self._settings),
                     on_preview=self._on_preview_frame,
                     on_error=self._on_pipeline_error,
+                    owner=self._owner,
                 )
             self._pipeline.start()
+            self.enroll_owner_btn.configure(state="normal")
+            self._refresh_stats()
         except Exception as exc:
             self._pipeline = None
             messagebox.showerror("Smart Privacy Cam", str(exc))
@@ -161,6 +196,8 @@ class SmartPrivacyApp(ctk.CTk):
         if self._pipeline is not None:
             self._pipeline.stop()
             self._pipeline = None
+        self.enroll_owner_btn.configure(state="disabled")
+        self._refresh_stats()
 
     def _on_preview_frame(self, frame_bgr) -> None:
         rgb = cv2.cvtColor(frame_bgr, cv2.COLOR_BGR2RGB)
@@ -174,6 +211,32 @@ class SmartPrivacyApp(ctk.CTk):
 
         self.after(0, set_image)
 
+    def _refresh_stats(self) -> None:
+        if self._stats_job is not None:
+            self.after_cancel(self._stats_job)
+            self._stats_job = None
+
+        self._refresh_owner_state()
+        if self._pipeline is None:
+            self.stats_label.configure(text="")
+            return
+
+        lines = [
+            f"{s.name}: {s.fps:.1f} fps, {s.avg_ms:.1f} ms, drop {s.dropped}"
+            for s in self._pipeline.stage_stats()
+        ]
+        self.stats_label.configure(text="\n".join(lines))
+        self._stats_job = self.after(1000, self._refresh_stats)
+
+    def _refresh_owner_state(self) -> None:
+        if self._owner.enrolling:
+            text = "Owner: enrolling..."
+        elif self._owner.enrolled:
+            text = "Owner: enrolled"
+        else:
+            text = "Owner: not enrolled"
+        self.owner_label.configure(text=text)
+
     def _apply_preset_by_name(self, name: str) -> None:
         preset = next((p for p in self._presets if p.name == name), None)
         if preset is None:
@@ -202,10 +265,19 @@ class SmartPrivacyApp(ctk.CTk):
         self._settings.enable_background_replace = self.bg_replace_switch.get() == 1
         self._update_pipeline_settings()
 
+    def _on_person_crop_toggle(self) -> None:
+        self._settings.enable_person_crop = self.person_crop_switch.get() == 1
+        self._update_pipeline_settings()
+
     def _on_owner_face_change(self, value: float) -> None:
         self._settings.owner_face_index = int(round(value))
         self._update_pipeline_settings()
 
+    def _on_enroll_owner(self) -> None:
+        if self._pipeline is not None:
+            self._owner.request_enrollment()
+            self._refresh_owner_state()
+
     def _update_pipeline_settings(self) -> None:
         if self._pipeline is not None:
             self._pipeline.update_settings(replace(self._settings))
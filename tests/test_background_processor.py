@@ -0,0 +1,127 @@
+from __future__ import annotations
+
+from types import SimpleNamespace
+
+import numpy as np
+
+from smart_privacy_cam.core.background_processor import (
+    CROP_MARGIN,
+    CROP_MODEL_INPUT_SIZE,
+    CROP_REFRESH_FRAMES,
+    BackgroundProcessor,
+)
+
+
+class _FakeSegmenter:
+    """Treats bright pixels as the person and records the input shapes."""
+
+    def __init__(self) -> None:
+        self.shapes: list[tuple[int, int]] = []
+
+    def process(self, rgb: np.ndarray) -> SimpleNamespace:
+        self.shapes.append(rgb.shape[:2])
+        return SimpleNamespace(segmentation_mask=(rgb[:, :, 0] > 127).astype(np.float32))
+
+
+def _processor() -> BackgroundProcessor:
+    processor = BackgroundProcessor.__new__(BackgroundProcessor)
+    processor._segmenter = _FakeSegmenter()
+    processor._crop_segmenter = _FakeSegmenter()
+    processor._roi = None
+    processor._frames_since_full = 0
+    return processor
+
+
+def _frame(x1: int, y1: int, x2: int, y2: int, shape: tuple[int, int] = (1080, 1920)) -> np.ndarray:
+    frame = np.zeros((*shape, 3), dtype=np.uint8)
+    frame[y1:y2, x1:x2] = 255
+    return frame
+
+
+def test_centre_third_full_height_person_is_cropped():
+    processor = _processor()
+    frame = _frame(640, 0, 1280, 1080)
+    expected = frame[:, :, 0] > 0
+
+    np.testing.assert_array_equal(processor.segment(frame, crop=True), expected)
+    np.testing.assert_array_equal(processor.segment(frame, crop=True), expected)
+
+    assert processor._segmenter.shapes == [(1080, 1920)]
+    crop_h, crop_w = processor._crop_segmenter.shapes[0]
+    assert crop_w / crop_h == CROP_MODEL_INPUT_SIZE[0] / CROP_MODEL_INPUT_SIZE[1]
+    assert processor._roi == (544, 0, 1376, 1080)
+
+
+def test_roi_is_clamped_to_the_frame():
+    mask = np.zeros((1080, 1920), dtype=bool)
+    mask[0:600, 0:400] = True
+
+    roi = BackgroundProcessor._person_roi(mask, (0, 0), (1080, 1920))
+
+    assert roi == (0, 0, 400 + int(400 * CROP_MARGIN), 600 + int(600 * CROP_MARGIN))
+
+
+def test_roi_is_placed_at_the_crop_offset():
+    crop_mask = np.zeros((200, 300), dtype=bool)
+    crop_mask[50:150, 100:200] = True
+
+    roi = BackgroundProcessor._person_roi(crop_mask, (500, 300), (1080, 1920))
+
+    assert roi == (585, 335, 715, 465)
+
+
+def test_large_person_is_not_cropped():
+    mask = np.zeros((1080, 1920), dtype=bool)
+    mask[:, 200:1720] = True
+
+    assert BackgroundProcessor._person_roi(mask, (0, 0), (1080, 1920)) is None
+
+
+def test_tall_crop_is_letterboxed_and_mask_keeps_its_size():
+    processor = _processor()
+    region = _frame(10, 0, 90, 300, shape=(300, 100))
+
+    mask = processor._segment_crop(region)
+
+    assert processor._crop_segmenter.shapes == [(300, 300)]
+    np.testing.assert_array_equal(mask, region[:, :, 0] > 0)
+
+
+def test_person_cut_off_by_the_crop_triggers_full_frame():
+    processor = _processor()
+    processor.segment(_frame(800, 300, 1100, 1080), crop=True)
+    x1, y1, x2, y2 = processor._roi
+
+    processor.segment(_frame(x1 - 100, y1 + 50, x2 - 50, 1080), crop=True)
+
+    assert processor._roi is None
+    processor.segment(_frame(800, 300, 1100, 1080), crop=True)
+    assert len(processor._segmenter.shapes) == 2
+    assert len(processor._crop_segmenter.shapes) == 1
+
+
+def test_full_frame_is_segmented_again_after_refresh_frames():
+    processor = _processor()
+    frame = _frame(800, 300, 1100, 1080)
+
+    for _ in range(CROP_REFRESH_FRAMES + 1):
+        processor.segment(frame, crop=True)
+    assert len(processor._segmenter.shapes) == 1
+    assert len(processor._crop_segmenter.shapes) == CROP_REFRESH_FRAMES
+
+    processor.segment(frame, crop=True)
+    assert len(processor._segmenter.shapes) == 2
+
+
+def test_narrow_frames_and_reset_skip_the_crop():
+    processor = _processor()
+    processor.segment(_frame(300, 100, 500, 480, shape=(480, 640)), crop=True)
+    assert processor._roi is None
+
+    processor.segment(_frame(800, 300, 1100, 1080), crop=True)
+    assert processor._roi is not None
+    processor.reset()
+    processor.segment(_frame(800, 300, 1100, 1080), crop=True)
+
+    assert len(processor._segmenter.shapes) == 3
+    assert processor._crop_segmenter.shapes == []
@@ -0,0 +1,157 @@
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from smart_privacy_cam.core.face_identity import (
+    ENROLL_FRAMES,
+    MATCH_THRESHOLD,
+    RECHECK_FRAMES,
+    OwnerProfile,
+    OwnerTracker,
+    descriptor_distances,
+    face_descriptors,
+)
+
+
+OWNER_BOX = np.array([100, 100, 400, 400], dtype=np.float32)
+BYSTANDER_BOX = np.array([700, 100, 900, 300], dtype=np.float32)
+MOVED_BOX = np.array([1200, 500, 1400, 700], dtype=np.float32)
+
+
+def _face(seed: int) -> np.ndarray:
+    return np.random.default_rng(seed).uniform(0, 200, size=(478, 3)).astype(np.float32)
+
+
+def _rotation(yaw: float, pitch: float, roll: float) -> np.ndarray:
+    cy, sy = np.cos(yaw), np.sin(yaw)
+    cp, sp = np.cos(pitch), np.sin(pitch)
+    cr, sr = np.cos(roll), np.sin(roll)
+    rz = np.array([[cr, -sr, 0], [sr, cr, 0], [0, 0, 1]])
+    ry = np.array([[cy, 0, sy], [0, 1, 0], [-sy, 0, cy]])
+    rx = np.array([[1, 0, 0], [0, cp, -sp], [0, sp, cp]])
+    return rz @ ry @ rx
+
+
+def _frame(*faces: tuple[np.ndarray, np.ndarray]) -> tuple[np.ndarray, np.ndarray]:
+    boxes = np.array([box for box, _ in faces], dtype=np.float32).reshape(-1, 4)
+    landmarks = np.array([face for _, face in faces], dtype=np.float32).reshape(-1, 478, 3)
+    return boxes, landmarks
+
+
+def _enrolled_tracker(owner: np.ndarray) -> OwnerTracker:
+    profile = OwnerProfile()
+    tracker = OwnerTracker(profile)
+    profile.request_enrollment()
+    for _ in range(ENROLL_FRAMES):
+        tracker.identify(*_frame((OWNER_BOX, owner)))
+    return tracker
+
+
+@pytest.mark.parametrize("scale", [0.5, 1.0, 2.5])
+def test_descriptor_ignores_pose_scale_and_position(scale):
+    face = _face(0)
+    moved = (face - face.mean(axis=0)) @ _rotation(0.4, -0.3, 0.5).T * scale + np.array([640, 360, 20])
+
+    distance = descriptor_distances(face_descriptors(moved[None]), face_descriptors(face[None])[0])
+
+    assert distance[0] == pytest.approx(0.0, abs=1e-5)
+
+
+def test_descriptor_ignores_mouth_and_jaw():
+    face = _face(0)
+    talking = face.copy()
+    talking[[0, 13, 14, 17, 61, 152, 199, 291]] += np.array([0, 25, 5], dtype=np.float32)
+
+    distance = descriptor_distances(face_descriptors(talking[None]), face_descriptors(face[None])[0])
+
+    assert distance[0] == 0.0
+
+
+def test_other_face_is_not_matched():
+    distance = descriptor_distances(face_descriptors(_face(1)[None]), face_descriptors(_face(0)[None])[0])
+
+    assert distance[0] > MATCH_THRESHOLD
+
+
+def test_enrollment_completes_after_enroll_frames():
+    profile = OwnerProfile()
+    tracker = OwnerTracker(profile)
+    owner = _face(0)
+
+    assert tracker.identify(*_frame((OWNER_BOX, owner))) is None
+
+    profile.request_enrollment()
+    for _ in range(ENROLL_FRAMES - 1):
+        flags = tracker.identify(*_frame((BYSTANDER_BOX, _face(1)), (OWNER_BOX, owner)))
+        assert flags.tolist() == [False, True]
+    assert profile.enrolling and not profile.enrolled
+
+    tracker.identify(*_frame((OWNER_BOX, owner)))
+
+    assert profile.enrolled and not profile.enrolling
+    np.testing.assert_allclose(profile.descriptor(), face_descriptors(owner[None])[0], rtol=1e-5)
+
+
+def test_enrollment_survives_a_new_tracker():
+    owner = _face(0)
+    profile = OwnerProfile()
+    tracker = OwnerTracker(profile)
+    profile.request_enrollment()
+    for _ in range(ENROLL_FRAMES):
+        tracker.identify(*_frame((OWNER_BOX, owner)))
+
+    flags = OwnerTracker(profile).identify(*_frame((BYSTANDER_BOX, _face(1)), (MOVED_BOX, owner)))
+
+    assert flags.tolist() == [False, True]
+
+
+def test_cancelled_enrollment_keeps_the_stored_owner():
+    owner = _face(0)
+    profile = OwnerProfile()
+    tracker = OwnerTracker(profile)
+    profile.request_enrollment()
+    for _ in range(ENROLL_FRAMES):
+        tracker.identify(*_frame((OWNER_BOX, owner)))
+
+    profile.request_enrollment()
+    tracker.identify(*_frame((BYSTANDER_BOX, _face(1))))
+    profile.cancel_enrollment()
+
+    assert profile.enrolled and not profile.enrolling
+    flags = OwnerTracker(profile).identify(*_frame((BYSTANDER_BOX, _face(1)), (MOVED_BOX, owner)))
+    assert flags.tolist() == [False, True]
+
+
+def test_owner_stays_flagged_when_bystander_is_detected_first():
+    owner = _face(0)
+    tracker = _enrolled_tracker(owner)
+
+    flags = tracker.identify(*_frame((BYSTANDER_BOX, _face(1)), (OWNER_BOX + 4, owner)))
+    assert flags.tolist() == [False, True]
+
+    flags = tracker.identify(*_frame((OWNER_BOX + 8, owner), (BYSTANDER_BOX, _face(1))))
+    assert flags.tolist() == [True, False]
+
+
+def test_owner_is_reacquired_after_a_missed_frame():
+    owner = _face(0)
+    tracker = _enrolled_tracker(owner)
+
+    assert tracker.identify(*_frame()).tolist() == []
+
+    flags = tracker.identify(*_frame((BYSTANDER_BOX, _face(1)), (MOVED_BOX, owner)))
+    assert flags.tolist() == [False, True]
+
+
+def test_unmatched_tracked_face_is_rechecked_after_recheck_frames():
+    owner = _face(0)
+    tracker = _enrolled_tracker(owner)
+    stretched = owner * np.array([1.0, 1.3, 1.0], dtype=np.float32)
+
+    assert tracker.identify(*_frame((MOVED_BOX, stretched))).tolist() == [False]
+
+    for _ in range(RECHECK_FRAMES - 1):
+        assert tracker.identify(*_frame((MOVED_BOX, owner))).tolist() == [False]
+
+    assert tracker.identify(*_frame((MOVED_BOX, owner))).tolist() == [True]
@@ -0,0 +1,178 @@
+from __future__ import annotations
+
+from functools import partial
+import multiprocessing as mp
+import os
+import queue
+import time
+
+import pytest
+
+from smart_privacy_cam.core.stage_graph import Stage, StageGraph, _Counters, _InputJoin, _Packet
+
+
+def _sleep_stage(seconds: float):
+    def factory():
+        def run(settings, frame):
+            time.sleep(seconds)
+            return frame
+
+        return run
+
+    return factory
+
+
+def _add_stage(amount: int):
+    return lambda settings, value: value + amount
+
+
+def _crash_stage():
+    os._exit(3)
+
+
+def _failing_stage():
+    def run(settings, value):
+        raise RuntimeError("boom")
+
+    return run
+
+
+def _pair_stage():
+    return lambda settings, a, b: (a, b)
+
+
+def _run_graph(detect_s: float, segment_s: float, duration: float = 1.0) -> tuple[dict, list]:
+    outputs: list = []
+    stages = [
+        Stage("detect", _sleep_stage(detect_s), inputs=("frame",), outputs=("faces",)),
+        Stage("segment", _sleep_stage(segment_s), inputs=("frame",), outputs=("mask",)),
+        Stage("composite", _pair_stage, inputs=("frame", "mask"), outputs=("composited",)),
+        Stage("overlay", _pair_stage, inputs=("composited", "faces"), outputs=("output",)),
+        Stage("sink", lambda: lambda settings, frame: outputs.append(frame), inputs=("output",)),
+    ]
+    graph = StageGraph(stages)
+    graph.start()
+    try:
+        started = time.perf_counter()
+        seq = 0
+        while time.perf_counter() - started < duration:
+            seq += 1
+            graph.submit("frame", seq, None)
+            time.sleep(1 / 30)
+        time.sleep(0.2)
+    finally:
+        graph.stop()
+    return {s.name: s for s in graph.stats()}, outputs
+
+
+@pytest.mark.parametrize(("detect_s", "segment_s"), [(0.030, 0.060), (0.015, 0.040)])
+def test_parallel_branches_see_the_same_frames(detect_s, segment_s):
+    stats, outputs = _run_graph(detect_s, segment_s)
+
+    assert outputs
+    for (frame, mask), faces in outputs:
+        assert frame == mask == faces
+    seqs = [faces for _, faces in outputs]
+    assert seqs == sorted(set(seqs))
+
+    # Both branches get the same frames, so nearly every frame the slow
+    # branch finishes is matched and reaches the sink.
+    assert abs(stats["detect"].frames - stats["segment"].frames) <= 2
+    assert stats["sink"].frames >= stats["segment"].frames - 2
+
+
+def test_stats_reset_after_restart():
+    stages = [Stage("sink", lambda: lambda settings, frame: None, inputs=("frame",))]
+    graph = StageGraph(stages)
+    for _ in range(2):
+        graph.start()
+        for seq in range(20):
+            graph.submit("frame", seq, None)
+            time.sleep(0.005)
+        time.sleep(0.1)
+        graph.stop()
+        (stats,) = graph.stats()
+        assert stats.frames == 20
+
+
+def test_join_releases_oldest_match_and_counts_discards():
+    counters = _Counters(mp.get_context("spawn"))
+    faces: queue.Queue = queue.Queue()
+    masks: queue.Queue = queue.Queue()
+    join = _InputJoin([faces, masks], counters)
+
+    for seq in (1, 2, 3, 4):
+        faces.put(_Packet(seq, None, f"f{seq}"))
+    for seq in (3, 4):
+        masks.put(_Packet(seq, None, f"m{seq}"))
+
+    assert [p.value for p in join.next()] == ["f3", "m3"]
+    assert counters.dropped.value == 2
+    assert [p.value for p in join.next()] == ["f4", "m4"]
+
+    faces.put(_Packet(2, None, "late"))
+    assert join.next(timeout=0.01) is None
+    assert counters.dropped.value == 3
+
+
+def _wait_for(predicate, timeout: float = 10.0) -> bool:
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+def test_chained_process_stages_deliver_frames():
+    outputs: list = []
+    errors: list = []
+    stages = [
+        Stage("a", partial(_add_stage, 1), inputs=("frame",), outputs=("a",), queue_size=64, placement="process"),
+        Stage("b", partial(_add_stage, 10), inputs=("a",), outputs=("b",), queue_size=64, placement="process"),
+        Stage("sink", lambda: lambda settings, value: outputs.append(value), inputs=("b",), queue_size=64),
+    ]
+    graph = StageGraph(stages, on_error=lambda name, message: errors.append((name, message)))
+    graph.start()
+    try:
+        for seq in range(30):
+            graph.submit("frame", seq, None)
+        assert _wait_for(lambda: len(outputs) == 30)
+    finally:
+        graph.stop()
+
+    assert outputs == [seq + 11 for seq in range(30)]
+    assert errors == []
+
+
+def test_stage_error_is_reported_and_stops_graph():
+    errors: list = []
+    graph = StageGraph(
+        [Stage("fail", _failing_stage, inputs=("frame",))],
+        on_error=lambda name, message: errors.append((name, message)),
+    )
+    graph.start()
+    try:
+        graph.submit("frame", 1, None)
+        assert _wait_for(lambda: errors)
+    finally:
+        graph.stop()
+
+    assert errors == [("fail", "boom")]
+    assert not graph.is_running()
+
+
+def test_dead_process_worker_is_reported():
+    errors: list = []
+    graph = StageGraph(
+        [Stage("crash", _crash_stage, inputs=("frame",), placement="process")],
+        on_error=lambda name, message: errors.append((name, message)),
+    )
+    graph.start()
+    try:
+        assert _wait_for(lambda: errors)
+    finally:
+        graph.stop()
+
+    assert [name for name, _ in errors] == ["crash"]
+    assert not graph.is_running()